@@ -1,19 +1,125 @@
 from __future__ import annotations
 
+import ast
+import bisect
+import functools
 import json
+import operator
 import os
 import re
-import signal
 import sys
 import math
+import time
 from datetime import date, datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Tuple
-import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import urllib.parse
 
-
-@dataclass
+try:
+    import orjson
+except ImportError:  # optional accelerator; fall back to the stdlib encoder
+    orjson = None
+
+
+# keyword patterns run on the lower-cased message, so they skip case folding;
+# the name pattern runs on the original to keep the user's capitalisation
+_GREETING_RE = re.compile(r"\b(hi|hello|hey)\b")
+_NAME_RE = re.compile(r"i\s*'?m\s+(?P<name>[A-Za-z][A-Za-z\-']{1,29})", re.IGNORECASE)
+_FAREWELL_RE = re.compile(r"\b(bye|goodbye|see ya|ttyl)\b")
+
+# reminder parsing runs on the lower-cased message; stripping keeps the original case
+_TIME_DELTA_RE = re.compile(r"in (\d+) (minute|minutes|hour|hours|day|days)")
+_WHEN_RE = re.compile(r"(tomorrow|today)")
+# one pass removes the command prefix, the time-delta phrase and tomorrow/today; the
+# lookahead lets the scanner skip positions that cannot start any of the three
+_REMIND_STRIP_RE = re.compile(
+    r"(?=[rit])(?:remind(?:me)?\s+(?:to\s+)?"
+    r"|in \d+ (?:minute|minutes|hour|hours|day|days)"
+    r"|to(?:morrow|day))",
+    re.IGNORECASE,
+)
+
+# argument shapes for age/leap, checked up front so bad input never raises
+_DATE_ARG_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_YEAR_ARG_RE = re.compile(r"[-+]?\d{1,9}")
+
+
+def _classify_keyword_intent(lower: str) -> Optional[str]:
+    """Return the built-in intent signalled by a keyword anywhere in the lower-cased message."""
+    # every greeting word contains an "h" and every farewell phrase a "y";
+    # skip the regex when the letter is missing
+    if "h" in lower and _GREETING_RE.search(lower) is not None:
+        return "greet"
+    if "help" in lower or "what can you do" in lower or "commands" in lower:
+        return "help"
+    if "y" in lower and _FAREWELL_RE.search(lower) is not None:
+        return "farewell"
+    return None
+
+@functools.lru_cache(maxsize=4096)
+def _format_minutes_left(minutes_left: int) -> str:
+    """Format whole minutes into human-readable time left; listings repeat the same buckets."""
+    if minutes_left < 0:
+        return "overdue"
+
+    days = minutes_left // 1440
+    hours = (minutes_left % 1440) // 60
+    minutes = minutes_left % 60
+
+    if days > 0:
+        return f"{days}d {hours}h left"
+    elif hours > 0:
+        return f"{hours}h {minutes}m left"
+    else:
+        return f"{minutes}m left"
+
+# received_at stamps made within the same second share their date/time prefix; the
+# (second, prefix) pair is replaced in one assignment so threads never see a mixed pair
+_utc_cache: Tuple[int, str] = (-1, "")
+
+
+def _utc_now_iso() -> str:
+    """Return the current UTC time as ISO-8601 with microseconds and a ``Z`` suffix."""
+    global _utc_cache
+    second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _utc_cache
+    if second != cached_second:
+        prefix = datetime.utcfromtimestamp(second).isoformat()
+        _utc_cache = (second, prefix)
+    return f"{prefix}.{micros:06d}Z"
+
+# record lists are stored column-wise (one list per field) rather than one dict per
+# record: the JSON is smaller and faster to encode and decode
+_RECORD_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "reminders": ("text", "due_time", "created"),
+    "notes": ("text", "created"),
+    "tasks": ("text", "created", "completed", "completed_at"),
+}
+
+# the journal is folded into a fresh snapshot once it outgrows the snapshot this many
+# times over, so replaying it on load stays proportional to the live state
+_JOURNAL_COMPACT_RATIO = 4
+_JOURNAL_MIN_BYTES = 1024 * 1024
+# with batch_writes, changes are written back at most this often (seconds), or
+# once this many messages have changed memory since the last write
+_FLUSH_INTERVAL = 0.1
+_FLUSH_EVERY = 16
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
+
+# slotted dataclasses need Python 3.10+; older interpreters keep the per-instance __dict__
+_DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class AgentResponse:
     text: str
     intent: str = "unknown"
@@ -21,52 +127,222 @@ class AgentResponse:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+def _empty_message_response() -> AgentResponse:
+    """Return the response process() gives a message with nothing left to handle."""
+    return AgentResponse(text="Please send a message.", intent="noop", confidence=1.0)
+
+
 Preprocessor = Callable[[str], str]
 Postprocessor = Callable[[AgentResponse], AgentResponse]
 Predicate = Callable[[str, Dict[str, Any]], bool]
 Handler = Callable[[str, Dict[str, Any]], AgentResponse]
 
+# ------------------------ Calculator ------------------------
+_CALC_NAMES: Dict[str, Any] = {k: v for k, v in math.__dict__.items() if not k.startswith("__")}
+
+_OP_PUSH, _OP_BINARY, _OP_UNARY, _OP_COMPARE, _OP_CALL = range(5)
+
+_CALC_BINARY_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+}
+_CALC_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Invert: operator.invert,
+    ast.Not: operator.not_,
+}
+_CALC_COMPARE_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+CalcProgram = Tuple[Tuple[int, Any], ...]
+
+
+def _calc_name(name: str) -> Any:
+    try:
+        return _CALC_NAMES[name]
+    except KeyError:
+        raise NameError(f"name '{name}' is not defined") from None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_calc(expr: str) -> CalcProgram:
+    """Compile an arithmetic expression over math names into a postfix program."""
+    code: List[Tuple[int, Any]] = []
+
+    def emit(node: ast.AST) -> None:
+        if isinstance(node, ast.Constant) and type(node.value) in (bool, int, float, complex):
+            code.append((_OP_PUSH, node.value))
+        elif isinstance(node, ast.Name):
+            code.append((_OP_PUSH, _calc_name(node.id)))
+        elif isinstance(node, ast.BinOp) and type(node.op) in _CALC_BINARY_OPS:
+            emit(node.left)
+            emit(node.right)
+            code.append((_OP_BINARY, _CALC_BINARY_OPS[type(node.op)]))
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_UNARY_OPS:
+            emit(node.operand)
+            code.append((_OP_UNARY, _CALC_UNARY_OPS[type(node.op)]))
+        elif isinstance(node, ast.Compare) and all(type(op) in _CALC_COMPARE_OPS for op in node.ops):
+            # a chain pushes every operand; unlike Python it does not stop at the first False
+            emit(node.left)
+            for comparator in node.comparators:
+                emit(comparator)
+            code.append((_OP_COMPARE, tuple(_CALC_COMPARE_OPS[type(op)] for op in node.ops)))
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            function = _calc_name(node.func.id)
+            for arg in node.args:
+                emit(arg)
+            code.append((_OP_CALL, (function, len(node.args))))
+        else:
+            raise ValueError(f"unsupported expression: {ast.get_source_segment(expr, node) or expr}")
+
+    emit(ast.parse(expr, filename="<calc>", mode="eval").body)
+    return tuple(code)
+
+
+def _eval_calc(code: CalcProgram) -> Any:
+    stack: List[Any] = []
+    push = stack.append
+    for opcode, arg in code:
+        if opcode == _OP_PUSH:
+            push(arg)
+        elif opcode == _OP_BINARY:
+            right = stack.pop()
+            stack[-1] = arg(stack[-1], right)
+        elif opcode == _OP_UNARY:
+            stack[-1] = arg(stack[-1])
+        elif opcode == _OP_COMPARE:
+            operands = stack[len(stack) - len(arg) - 1:]
+            del stack[len(stack) - len(arg) - 1:]
+            push(all(compare(left, right) for compare, left, right in zip(arg, operands, operands[1:])))
+        else:
+            function, argc = arg
+            args = stack[len(stack) - argc:]
+            del stack[len(stack) - argc:]
+            push(function(*args))
+    return stack[-1]
+
 class MessageAgent:
     """
     A lightweight, extensible agent for handling user messages.
 
     Features:
-    - Rule-based handler registry with predicates
+    - Rule-based handler registry with predicates and first-word keyword dispatch
     - Simple persistent memory (JSON file)
     - Pluggable pre/post-processors
     - Built-in intents including reminders, notes, tasks, and web search
     """
+
+    __slots__ = (
+        "memory_path",
+        "_memory",
+        "_dirty_keys",
+        "_snapshot_bytes",
+        "_journal_bytes",
+        "_batch_writes",
+        "_last_flush",
+        "_unflushed",
+        "_handlers",
+        "_keyword_dispatch",
+        "_prefix_dispatch",
+        "_keyword_intents",
+        "_trusted_preprocessors",
+        "_preprocessors",
+        "_postprocessors",
+    )
     
     def __init__(
         self,
         memory_path: str = ".agent_memory.json",
         preprocessors: Optional[List[Preprocessor]] = None,
         postprocessors: Optional[List[Postprocessor]] = None,
+        batch_writes: bool = False,
     ) -> None:
         self.memory_path = memory_path
         self._memory: Dict[str, Any] = {}
-        self._handlers: List[Tuple[Predicate, Handler]] = []
-        self._preprocessors: List[Preprocessor] = preprocessors or []
-        self._postprocessors: List[Postprocessor] = postprocessors or []
+        self._dirty_keys: Set[str] = set()
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        self._batch_writes = batch_writes
+        self._last_flush = 0.0
+        self._unflushed = 0
+        # read on every message, written only at registration time
+        self._handlers: Tuple[Tuple[Predicate, Handler, bool], ...] = ()
+        self._keyword_dispatch: Dict[str, Tuple[Predicate, Handler, bool]] = {}
+        self._prefix_dispatch: Tuple[Tuple[str, Tuple[Predicate, Handler, bool]], ...] = ()
+        self._keyword_intents: Dict[str, Handler] = {}
+        self._trusted_preprocessors: Tuple[Preprocessor, ...] = ()
+        self._preprocessors: Tuple[Preprocessor, ...] = tuple(preprocessors or ())
+        self._postprocessors: Tuple[Postprocessor, ...] = tuple(postprocessors or ())
 
         self._install_default_handlers()
         self._load_memory()
 
     # ------------------------ Public API ------------------------
-    def register_handler(self, predicate: Predicate, handler: Handler) -> None:
-        self._handlers.append((predicate, handler))
+    def register_handler(
+        self,
+        predicate: Predicate,
+        handler: Handler,
+        keywords: Tuple[str, ...] = (),
+        safe: bool = False,
+        prefixes: Tuple[str, ...] = (),
+    ) -> None:
+        """
+        Register a handler guarded by a predicate.
+
+        Handlers given ``keywords`` are only considered when the first word of
+        the message is one of them (case-insensitive). Handlers given
+        ``prefixes`` are tried next, when the lower-cased message starts with
+        one of them, which also catches "remind," or "reminding". Handlers
+        with neither are scanned in registration order. ``safe`` handlers are
+        trusted not to raise and run without the handler error guard.
+
+        During process() the lower-cased message is available to predicates
+        and handlers as ``context["_lower"]``.
+        """
+        entry = (predicate, handler, safe)
+        self._prefix_dispatch += tuple((prefix.lower(), entry) for prefix in prefixes)
+        if not keywords:
+            if not prefixes:
+                self._handlers += (entry,)
+            return
+        for keyword in keywords:
+            self._keyword_dispatch[keyword.lower()] = entry
 
     def add_preprocessor(self, preprocessor: Preprocessor) -> None:
-        self._preprocessors.append(preprocessor)
+        self._preprocessors += (preprocessor,)
 
     def add_postprocessor(self, postprocessor: Postprocessor) -> None:
-        self._postprocessors.append(postprocessor)
+        self._postprocessors += (postprocessor,)
 
     def process(self, message: str, context: Optional[Dict[str, Any]] = None) -> AgentResponse:
         if context is None:
             context = {}
 
+        # nothing to match or remember, and no reason to schedule a memory write
+        if not message or message.isspace():
+            return _empty_message_response()
+
         original_message = message
+        # built-in normalization cannot raise on str input, so it skips the guard
+        for preprocessor in self._trusted_preprocessors:
+            message = preprocessor(message)
         for preprocessor in self._preprocessors:
             try:
                 message = preprocessor(message)
@@ -77,24 +353,32 @@ class MessageAgent:
                     confidence=1.0,
                     metadata={"stage": "preprocessor"},
                 )
-
-        for predicate, handler in self._handlers:
-            try:
-                if predicate(message, context):
-                    response = handler(message, context)
-                    response.metadata.setdefault("received_at", datetime.utcnow().isoformat() + "Z")
-                    response.metadata.setdefault("original_message", original_message)
+        # a preprocessor may have stripped the message down to nothing
+        if not message or message.isspace():
+            return _empty_message_response()
+
+        context["_lower"] = lower = message.lower()
+        response: Optional[AgentResponse] = None
+        keyword_entry = self._keyword_dispatch.get(lower.partition(" ")[0])
+        if keyword_entry is not None:
+            response = self._run_handler(keyword_entry, message, original_message, context)
+        if response is None:
+            for prefix, entry in self._prefix_dispatch:
+                if lower.startswith(prefix):
+                    response = self._run_handler(entry, message, original_message, context)
+                    if response is not None:
+                        break
+        if response is None:
+            intent = _classify_keyword_intent(lower)
+            if intent is not None:
+                response = self._stamp_metadata(self._keyword_intents[intent](message, context), original_message)
+        if response is None:
+            for entry in self._handlers:
+                response = self._run_handler(entry, message, original_message, context)
+                if response is not None:
                     break
-            except Exception as handler_error:
-                response = AgentResponse(
-                    text=f"Handler error: {handler_error}",
-                    intent="error",
-                    confidence=1.0,
-                    metadata={"stage": "handler"},
-                )
-                break
-        else:
-            response = self._fallback_handler(message, context)
+            else:
+                response = self._fallback_handler(message, context)
 
         for postprocessor in self._postprocessors:
             try:
@@ -107,34 +391,88 @@ class MessageAgent:
                     metadata={"stage": "postprocessor"},
                 )
 
-        self._save_memory()
+        if self._dirty_keys:
+            self._unflushed += 1
+            if (
+                not self._batch_writes
+                or self._unflushed >= _FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= _FLUSH_INTERVAL
+            ):
+                self._save_memory()
         return response
 
+    def flush(self) -> None:
+        """
+        Write out changes still held back by write batching.
+
+        An agent created with ``batch_writes=True`` must be flushed before it is
+        dropped or the program exits; nothing else writes its last batch.
+        """
+        if self._dirty_keys:
+            self._save_memory()
+
     def reset_memory(self) -> None:
         self._memory = {}
-        self._save_memory()
+        self._dirty_keys.clear()
+        self._compact_memory()
 
     def __str__(self) -> str:
-        return f"<MessageAgent handlers={len(self._handlers)} memory_keys={list(self._memory.keys())}>"
+        entries = set(self._keyword_dispatch.values()).union(entry for _, entry in self._prefix_dispatch)
+        handler_count = len(self._handlers) + len(entries) + len(self._keyword_intents)
+        return f"<MessageAgent handlers={handler_count} memory_keys={list(self._memory.keys())}>"
+
+    # ------------------------ Dispatch ------------------------
+    def _run_handler(
+        self,
+        entry: Tuple[Predicate, Handler, bool],
+        message: str,
+        original_message: str,
+        context: Dict[str, Any],
+    ) -> Optional[AgentResponse]:
+        predicate, handler, safe = entry
+        if safe:
+            if not predicate(message, context):
+                return None
+            return self._stamp_metadata(handler(message, context), original_message)
+        try:
+            if not predicate(message, context):
+                return None
+            return self._stamp_metadata(handler(message, context), original_message)
+        except Exception as handler_error:
+            return AgentResponse(
+                text=f"Handler error: {handler_error}",
+                intent="error",
+                confidence=1.0,
+                metadata={"stage": "handler"},
+            )
+
+    @staticmethod
+    def _stamp_metadata(response: AgentResponse, original_message: str) -> AgentResponse:
+        metadata = response.metadata
+        if "received_at" not in metadata:
+            metadata["received_at"] = _utc_now_iso()
+        metadata.setdefault("original_message", original_message)
+        return response
 
     # ------------------------ Defaults ------------------------
     def _install_default_handlers(self) -> None:
-        # keep existing preprocessors
-        self.add_preprocessor(lambda m: m.strip())
-        self.add_preprocessor(lambda m: re.sub(r"\s+", " ", m))
+        # whitespace normalization runs unguarded, ahead of every user preprocessor
+        self._trusted_preprocessors += (lambda m: " ".join(m.split()),)
 
-        # ---------------- GREETING ----------------
-        def is_greeting(message: str, _: Dict[str, Any]) -> bool:
-            return bool(re.search(r"\b(hi|hello|hey)\b", message, re.IGNORECASE))
+        # Greeting, help and farewell react to keywords anywhere in the message and
+        # are picked by _classify_keyword_intent in that priority order.
 
+        # ---------------- GREETING ----------------
         def handle_greeting(message: str, context: Dict[str, Any]) -> AgentResponse:
             user_name = context.get("user_name") or self._memory.get("user_name")
-            if not user_name:
-                # best-effort extraction
-                name_match = re.search(r"i\s*'?m\s+(?P<name>[A-Za-z][A-Za-z\-']{1,29})", message, re.IGNORECASE)
+            # best-effort extraction; _NAME_RE needs an "m" followed by whitespace, and
+            # normalization leaves single spaces, so most greetings skip the regex
+            if not user_name and "m " in context["_lower"]:
+                name_match = _NAME_RE.search(message)
                 if name_match:
                     user_name = name_match.group("name")
                     self._memory["user_name"] = user_name
+                    self._touch("user_name")
             greeting_name = f", {user_name}" if user_name else ""
             return AgentResponse(
                 text=f"Hello{greeting_name}! How can I help you today?",
@@ -142,12 +480,9 @@ class MessageAgent:
                 confidence=0.95,
             )
 
-        self.register_handler(is_greeting, handle_greeting)
+        self._keyword_intents["greet"] = handle_greeting
 
         # ---------------- HELP ----------------
-        def is_help(message: str, _: Dict[str, Any]) -> bool:
-            return any(keyword in message.lower() for keyword in ["help", "what can you do", "commands", "?help"])
-
         def handle_help(_: str, __: Dict[str, Any]) -> AgentResponse:
             help_text = (
                 "I can:\n"
@@ -164,198 +499,203 @@ class MessageAgent:
             )
             return AgentResponse(text=help_text, intent="help", confidence=0.9)
 
-        self.register_handler(is_help, handle_help)
+        self._keyword_intents["help"] = handle_help
 
         # ---------------- FAREWELL ----------------
-        def is_farewell(message: str, _: Dict[str, Any]) -> bool:
-            return bool(re.search(r"\b(bye|goodbye|see ya|ttyl)\b", message, re.IGNORECASE))
-
         def handle_farewell(_: str, __: Dict[str, Any]) -> AgentResponse:
             return AgentResponse(text="Goodbye! 👋", intent="farewell", confidence=0.9)
 
-        self.register_handler(is_farewell, handle_farewell)
+        self._keyword_intents["farewell"] = handle_farewell
 
         # ---------------- ECHO ----------------
-        def is_echo(message: str, _: Dict[str, Any]) -> bool:
-            return message.lower().startswith("/echo ") or message.lower() == "/echo"
+        def is_echo(_: str, context: Dict[str, Any]) -> bool:
+            lower = context["_lower"]
+            return lower.startswith("/echo ") or lower == "/echo"
             
         def handle_echo(message: str, _: Dict[str, Any]) -> AgentResponse:
             parts = message.split(" ", 1)
             text_to_echo = parts[1] if len(parts) > 1 else ""
             return AgentResponse(text=text_to_echo, intent="echo", confidence=0.99)
 
-        self.register_handler(is_echo, handle_echo)
+        self.register_handler(is_echo, handle_echo, keywords=("/echo",), safe=True)
 
         # ---------------- CALCULATION ----------------
-        def is_calc(message: str, _: Dict[str, Any]) -> bool:
-            return message.lower().startswith("calc ")
+        def is_calc(_: str, context: Dict[str, Any]) -> bool:
+            return context["_lower"].startswith("calc ")
 
         def handle_calc(message: str, _: Dict[str, Any]) -> AgentResponse:
             expr = message[5:].strip()
             try:
-                # Safe eval: only math functions and numbers
-                allowed_names = {k: v for k, v in math.__dict__.items() if not k.startswith("__")}
-                result = eval(expr, {"__builtins__": {}}, allowed_names)
+                # Only numbers, arithmetic operators and math names; no eval()
+                result = _eval_calc(_compile_calc(expr))
                 return AgentResponse(text=f"Result: {result}", intent="calc", confidence=0.95)
             except Exception as e:
                 return AgentResponse(text=f"Error in calculation: {e}", intent="error", confidence=1.0)
 
-        self.register_handler(is_calc, handle_calc)
+        self.register_handler(is_calc, handle_calc, keywords=("calc",), safe=True)
 
         # ---------------- AGE ----------------
-        def is_age(message: str, _: Dict[str, Any]) -> bool:
-            return message.lower().startswith("age ")
+        def is_age(_: str, context: Dict[str, Any]) -> bool:
+            return context["_lower"].startswith("age ")
 
         def handle_age(message: str, _: Dict[str, Any]) -> AgentResponse:
-            try:
-                dob_str = message.split(" ", 1)[1].strip()
-                dob = datetime.strptime(dob_str, "%Y-%m-%d").date()
-                today = date.today()
-                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                return AgentResponse(text=f"You are {age} years old.", intent="age", confidence=0.95)
-            except Exception:
+            dob_str = message[4:].strip()
+            match = _DATE_ARG_RE.fullmatch(dob_str)
+            dob = None
+            if match is not None:
+                try:
+                    # fromisoformat is the fast path but only takes zero-padded fields
+                    if len(dob_str) == 10:
+                        dob = date.fromisoformat(dob_str)
+                    else:
+                        dob = date(int(match[1]), int(match[2]), int(match[3]))
+                except ValueError:  # well-formed but not a calendar date, e.g. 2001-02-29
+                    pass
+            if dob is None:
                 return AgentResponse(
                     text="Usage: age YYYY-MM-DD (example: age 2000-05-17)",
                     intent="error",
                     confidence=1.0,
                 )
+            today = date.today()
+            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+            return AgentResponse(text=f"You are {age} years old.", intent="age", confidence=0.95)
 
-        self.register_handler(is_age, handle_age)
+        self.register_handler(is_age, handle_age, keywords=("age",), safe=True)
 
         # ---------------- LEAP YEAR ----------------
-        def is_leap(message: str, _: Dict[str, Any]) -> bool:
-            return message.lower().startswith("leap ")
+        def is_leap(_: str, context: Dict[str, Any]) -> bool:
+            return context["_lower"].startswith("leap ")
 
         def handle_leap(message: str, _: Dict[str, Any]) -> AgentResponse:
-            try:
-                year = int(message.split(" ", 1)[1].strip())
-                is_leap = (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0)
-                return AgentResponse(
-                    text=f"{year} is {'a leap year' if is_leap else 'not a leap year'}.",
-                    intent="leap_year",
-                    confidence=0.95,
-                )
-            except Exception:
+            year_str = message[5:].strip()
+            if _YEAR_ARG_RE.fullmatch(year_str) is None:
                 return AgentResponse(text="Usage: leap YEAR (example: leap 2024)", intent="error", confidence=1.0)
+            year = int(year_str)
+            # divisible by 4, and not by 100 unless by 400: with 4 | year, 100 | year iff 25 | year
+            # and 400 | year iff 16 | year
+            is_leap = (year & 3) == 0 and (year % 25 != 0 or (year & 15) == 0)
+            return AgentResponse(
+                text=f"{year} is {'a leap year' if is_leap else 'not a leap year'}.",
+                intent="leap_year",
+                confidence=0.95,
+            )
 
-        self.register_handler(is_leap, handle_leap)
+        self.register_handler(is_leap, handle_leap, keywords=("leap",), safe=True)
 
         # ---------------- REMINDERS ----------------
-        def is_reminder(message: str, _: Dict[str, Any]) -> bool:
-            msg_lower = message.lower()
+        def is_reminder(_: str, context: Dict[str, Any]) -> bool:
+            msg_lower = context["_lower"]
             return msg_lower.startswith("remind") or msg_lower == "reminders"
 
 
-        def handle_reminder(message: str, _: Dict[str, Any]) -> AgentResponse:
-            msg_lower = message.lower()
+        def handle_reminder(message: str, context: Dict[str, Any]) -> AgentResponse:
+            msg_lower = context["_lower"]
+            now = datetime.now()
             
             # List reminders
             if msg_lower == "reminders":
-                reminders = self._memory.get("reminders", [])
-                if not reminders:
+                reminders = self._memory.get("reminders")
+                if not reminders or not reminders["text"]:
                     return AgentResponse(text="No reminders set.", intent="reminder_list", confidence=0.95)
                 
-                now = datetime.now()
-                active = []
-                for idx, r in enumerate(reminders, 1):
-                    due = datetime.fromisoformat(r["due_time"])
-                    status = "⏰ DUE" if due <= now else f"⏳ {self._format_time_left(due - now)}"
-                    active.append(f"{idx}. {r['text']} - {status}")
+                now_ts = now.timestamp()
+                active = "\n".join([
+                    f"{idx}. {text} - ⏰ DUE" if due <= now_ts
+                    else f"{idx}. {text} - ⏳ {_format_minutes_left(int(due - now_ts) // 60)}"
+                    for idx, (text, due) in enumerate(zip(reminders["text"], reminders["due_time"]), 1)
+                ])
                 
                 return AgentResponse(
-                    text="Your reminders:\n" + "\n".join(active),
+                    text="Your reminders:\n" + active,
                     intent="reminder_list",
                     confidence=0.95
                 )
 
             # Set reminder
+            time_match = _TIME_DELTA_RE.search(msg_lower)
+            when_match = _WHEN_RE.search(msg_lower)
+
+            due_time = None
             try:
-                # Parse time delta
-                time_match = re.search(r'in (\d+) (minute|minutes|hour|hours|day|days)', msg_lower)
-                when_match = re.search(r'(tomorrow|today)', msg_lower)
-                
-                due_time = None
-                
                 if time_match:
                     amount = int(time_match.group(1))
                     unit = time_match.group(2)
                     
                     if 'minute' in unit:
-                        due_time = datetime.now() + timedelta(minutes=amount)
+                        due_time = now + timedelta(minutes=amount)
                     elif 'hour' in unit:
-                        due_time = datetime.now() + timedelta(hours=amount)
+                        due_time = now + timedelta(hours=amount)
                     elif 'day' in unit:
-                        due_time = datetime.now() + timedelta(days=amount)
+                        due_time = now + timedelta(days=amount)
                         
                 elif when_match:
                     when = when_match.group(1)
                     if when == "tomorrow":
-                        due_time = datetime.now() + timedelta(days=1)
+                        due_time = now + timedelta(days=1)
                         due_time = due_time.replace(hour=9, minute=0, second=0, microsecond=0)
                     elif when == "today":
-                        due_time = datetime.now() + timedelta(hours=1)
-                
-                if not due_time:
-                    return AgentResponse(
-                        text="Usage: 'remind me to [task] in [X] hours/days' or 'remind [task] tomorrow'",
-                        intent="error",
-                        confidence=1.0
-                    )
-
-                # Extract reminder text
-                reminder_text = re.sub(r'remind(me)?\s+(to\s+)?', '', message, flags=re.IGNORECASE)
-                reminder_text = re.sub(r'in \d+ (minute|minutes|hour|hours|day|days)', '', reminder_text, flags=re.IGNORECASE)
-                reminder_text = re.sub(r'(tomorrow|today)', '', reminder_text, flags=re.IGNORECASE)
-                reminder_text = reminder_text.strip()
-                
-                if not reminder_text:
-                    reminder_text = "Reminder"
-                    
-                # Store reminder
-                reminders = self._memory.setdefault("reminders", [])
-                reminders.append({
-                    "text": reminder_text,
-                    "due_time": due_time.isoformat(),
-                    "created": datetime.now().isoformat()
-                })
-                
-                time_str = due_time.strftime("%I:%M %p on %b %d")
+                        due_time = now + timedelta(hours=1)
+                due_ts = due_time.timestamp() if due_time else None
+            except (OverflowError, ValueError) as e:  # amounts past datetime's range
                 return AgentResponse(
-                    text=f"✓ Reminder set: '{reminder_text}' at {time_str}",
-                    intent="reminder_set",
-                    confidence=0.95
+                    text=f"Error setting reminder: {e}",
+                    intent="error",
+                    confidence=1.0
                 )
-                
-            except Exception as e:
+            
+            if not due_time:
                 return AgentResponse(
-                    text=f"Error setting reminder: {e}",
+                    text="Usage: 'remind me to [task] in [X] hours/days' or 'remind [task] tomorrow'",
                     intent="error",
                     confidence=1.0
                 )
 
-        self.register_handler(is_reminder, handle_reminder)
+            # Extract reminder text
+            reminder_text = _REMIND_STRIP_RE.sub('', message).strip()
+            
+            if not reminder_text:
+                reminder_text = "Reminder"
+                
+            # Store reminder, keeping the list ordered by due time
+            reminders = self._records("reminders")
+            position = bisect.bisect_right(reminders["due_time"], due_ts)
+            reminders["text"].insert(position, reminder_text)
+            reminders["due_time"].insert(position, due_ts)
+            reminders["created"].insert(position, now.timestamp())
+            self._touch("reminders")
+            
+            time_str = due_time.strftime("%I:%M %p on %b %d")
+            return AgentResponse(
+                text=f"✓ Reminder set: '{reminder_text}' at {time_str}",
+                intent="reminder_set",
+                confidence=0.95
+            )
+
+        self.register_handler(is_reminder, handle_reminder, prefixes=("remind",))
         
         # ---------------- NOTES ----------------
-        def is_note(message: str, _: Dict[str, Any]) -> bool:
-            msg_lower = message.lower()
+        def is_note(_: str, context: Dict[str, Any]) -> bool:
+            msg_lower = context["_lower"]
             return msg_lower.startswith("note ") or msg_lower == "notes"
             
-        def handle_note(message: str, _: Dict[str, Any]) -> AgentResponse:
-            msg_lower = message.lower()
+        def handle_note(message: str, context: Dict[str, Any]) -> AgentResponse:
+            msg_lower = context["_lower"]
             
             # List notes
             if msg_lower == "notes":
-                notes = self._memory.get("notes", [])
-                if not notes:
+                notes = self._memory.get("notes")
+                if not notes or not notes["text"]:
                     return AgentResponse(text="No notes saved.", intent="note_list", confidence=0.95)
                 
-                note_list = []
-                for idx, note in enumerate(notes, 1):
-                    timestamp = datetime.fromisoformat(note["created"]).strftime("%b %d, %I:%M %p")
-                    note_list.append(f"{idx}. {note['text']} ({timestamp})")
+                fromtimestamp = datetime.fromtimestamp
+                note_list = "\n".join([
+                    f"{idx}. {text} ({fromtimestamp(created).strftime('%b %d, %I:%M %p')})"
+                    for idx, (text, created) in enumerate(zip(notes["text"], notes["created"]), 1)
+                ])
                 
                 return AgentResponse(
-                    text="Your notes:\n" + "\n".join(note_list),
+                    text="Your notes:\n" + note_list,
                     intent="note_list",
                     confidence=0.95
                 )
@@ -368,11 +708,10 @@ class MessageAgent:
                     intent="error",
                     confidence=1.0
                 )
-            notes = self._memory.setdefault("notes", [])
-            notes.append({
-                "text": note_text,
-                "created": datetime.now().isoformat()
-            })
+            notes = self._records("notes")
+            notes["text"].append(note_text)
+            notes["created"].append(datetime.now().timestamp())
+            self._touch("notes")
             
             return AgentResponse(
                 text=f"✓ Note saved: '{note_text}'",
@@ -380,33 +719,26 @@ class MessageAgent:
                 confidence=0.95
             )
 
-        self.register_handler(is_note, handle_note)
+        self.register_handler(is_note, handle_note, keywords=("note", "notes"))
 
         # ---------------- TASKS ----------------
-        def is_task(message: str, _: Dict[str, Any]) -> bool:
-            msg_lower = message.lower()
+        def is_task(_: str, context: Dict[str, Any]) -> bool:
+            msg_lower = context["_lower"]
             return (msg_lower.startswith("task ") or msg_lower == "tasks" or 
                     msg_lower.startswith("done ") or msg_lower.startswith("delete task "))
 
-        def handle_task(message: str, _: Dict[str, Any]) -> AgentResponse:
-            msg_lower = message.lower()
+        def handle_task(message: str, context: Dict[str, Any]) -> AgentResponse:
+            msg_lower = context["_lower"]
             
             # List tasks
             if msg_lower == "tasks":
-                tasks = self._memory.get("tasks", [])
-                if not tasks:
+                tasks = self._memory.get("tasks")
+                if not tasks or not tasks["text"]:
                     return AgentResponse(text="No tasks found.", intent="task_list", confidence=0.95)
                 
-                pending = []
-                completed = []
-
-                for idx, task in enumerate(tasks, 1):
-                    status = "✓" if task.get("completed") else "○"
-                    task_str = f"{idx}. {status} {task['text']}"
-                    if task.get("completed"):
-                        completed.append(task_str)
-                    else:
-                        pending.append(task_str)
+                texts, done_flags = tasks["text"], tasks["completed"]
+                pending = [f"{idx}. ○ {text}" for idx, (text, done) in enumerate(zip(texts, done_flags), 1) if not done]
+                completed = [f"{idx}. ✓ {text}" for idx, (text, done) in enumerate(zip(texts, done_flags), 1) if done]
 
                 result = []
                 if pending:
@@ -424,11 +756,12 @@ class MessageAgent:
             if msg_lower.startswith("done "):
                 try:
                     task_num = int(message.split()[1])
-                    tasks = self._memory.get("tasks", [])
+                    tasks = self._memory.get("tasks")
                     
-                    if 1 <= task_num <= len(tasks):
-                        tasks[task_num - 1]["completed"] = True
-                        tasks[task_num - 1]["completed_at"] = datetime.now().isoformat()
+                    if tasks and 1 <= task_num <= len(tasks["text"]):
+                        tasks["completed"][task_num - 1] = True
+                        tasks["completed_at"][task_num - 1] = datetime.now().timestamp()
+                        self._touch("tasks")
                         return AgentResponse(
                             text=f"✓ Task {task_num} marked as done!",
                             intent="task_complete",
@@ -456,12 +789,12 @@ class MessageAgent:
                     confidence=1.0
                 )
             
-            tasks = self._memory.setdefault("tasks", [])
-            tasks.append({
-                "text": task_text,
-                "created": datetime.now().isoformat(),
-                "completed": False
-            })
+            tasks = self._records("tasks")
+            tasks["text"].append(task_text)
+            tasks["created"].append(datetime.now().timestamp())
+            tasks["completed"].append(False)
+            tasks["completed_at"].append(None)
+            self._touch("tasks")
             
             return AgentResponse(
                 text=f"✓ Task added: '{task_text}'",
@@ -469,11 +802,11 @@ class MessageAgent:
                 confidence=0.95
             )
 
-        self.register_handler(is_task, handle_task)
+        self.register_handler(is_task, handle_task, keywords=("task", "tasks", "done", "delete"))
         
         # ---------------- WEB SEARCH ----------------
-        def is_search(message: str, _: Dict[str, Any]) -> bool:
-            return message.lower().startswith("search ")
+        def is_search(_: str, context: Dict[str, Any]) -> bool:
+            return context["_lower"].startswith("search ")
 
         def handle_search(message: str, _: Dict[str, Any]) -> AgentResponse:
             query = message[7:].strip()
@@ -485,12 +818,17 @@ class MessageAgent:
                 )
 
             try:
+                # imported on first search: urllib.request pulls in ssl and http.client.
+                # Bound under its own name; "import urllib.request" here would make
+                # urllib local to the whole function and break the urllib.parse calls
+                from urllib import request as urllib_request
+
                 # Use DuckDuckGo Instant Answer API (simple, no API key needed)
                 encoded_query = urllib.parse.quote(query)
                 url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
                 
-                req = urllib.request.Request(url, headers={'User-Agent': 'MessageAgent/1.0'})
-                with urllib.request.urlopen(req, timeout=5) as response:
+                req = urllib_request.Request(url, headers={'User-Agent': 'MessageAgent/1.0'})
+                with urllib_request.urlopen(req, timeout=5) as response:
                     data = json.loads(response.read().decode())
                 
                 # Extract useful information
@@ -525,19 +863,33 @@ class MessageAgent:
                 )
 
             except Exception as e:
+                # search runs unguarded and quote() raises on a lone surrogate (undecodable
+                # argv bytes), so the fallback link replaces what it cannot encode
+                fallback_query = urllib.parse.quote(query, errors="replace")
                 return AgentResponse(
-                    text=f"Search unavailable. Try: https://duckduckgo.com/?q={encoded_query}\nError: {e}",
+                    text=f"Search unavailable. Try: https://duckduckgo.com/?q={fallback_query}\nError: {e}",
                     intent="error",
                     confidence=1.0
                 )
 
-        self.register_handler(is_search, handle_search)
+        self.register_handler(is_search, handle_search, keywords=("search",), safe=True)
+
+        # ---------------- RESET ----------------
+        def is_reset(_: str, context: Dict[str, Any]) -> bool:
+            return context["_lower"] == "/reset"
+
+        def handle_reset(_: str, __: Dict[str, Any]) -> AgentResponse:
+            self.reset_memory()
+            return AgentResponse(text="Memory cleared.", intent="reset", confidence=1.0)
+
+        self.register_handler(is_reset, handle_reset, keywords=("/reset",), safe=True)
         
     def _fallback_handler(self, message: str, _: Dict[str, Any]) -> AgentResponse:
         recent_messages: List[str] = self._memory.setdefault("recent_messages", [])
         recent_messages.append(message)
         if len(recent_messages) > 20:
             recent_messages.pop(0)
+        self._touch("recent_messages")
         return AgentResponse(
             text="I am not sure how to handle that yet. Try 'help' to see options.",
             intent="fallback",
@@ -545,53 +897,174 @@ class MessageAgent:
             metadata={"recent_messages_count": len(recent_messages)},
         )
 
-    def _format_time_left(self, delta: timedelta) -> str:
-        """Format a timedelta into human-readable time left."""
-        total_seconds = int(delta.total_seconds())
-        
-        if total_seconds < 0:
-            return "overdue"
-        
-        days = total_seconds // 86400
-        hours = (total_seconds % 86400) // 3600
-        minutes = (total_seconds % 3600) // 60
-        
-        if days > 0:
-            return f"{days}d {hours}h left"
-        elif hours > 0:
-            return f"{hours}h {minutes}m left"
-        else:
-            return f"{minutes}m left"
-            
     # ------------------------ Memory ------------------------
+    def _records(self, key: str) -> Dict[str, List[Any]]:
+        """Return the column table stored under ``key``, creating an empty one if needed."""
+        table = self._memory.get(key)
+        if table is None:
+            table = self._memory[key] = {name: [] for name in _RECORD_COLUMNS[key]}
+        return table
+
+    def _touch(self, key: str) -> None:
+        """Mark a top-level memory key as changed so the next process() call persists it."""
+        self._dirty_keys.add(key)
+
+    def _journal_path(self) -> str:
+        return f"{self.memory_path}.log"
+
     def _load_memory(self) -> None:
+        self._memory = {}
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
         if not self.memory_path:
-            self._memory = {}
             return
-        if not os.path.exists(self.memory_path):
-            self._memory = {}
+        if os.path.exists(self.memory_path):
+            try:
+                with open(self.memory_path, "rb") as file:
+                    data = file.read()
+                self._snapshot_bytes = len(data)
+                self._memory = _loads(data)
+            except Exception:
+                self._memory = {}
+            if not isinstance(self._memory, dict):
+                self._memory = {}
+        torn = False
+        if os.path.exists(self._journal_path()):
+            try:
+                with open(self._journal_path(), "rb") as file:
+                    for line in file:
+                        try:
+                            record = _loads(line)
+                            self._memory[record["k"]] = record["v"]
+                        except Exception:
+                            torn = True  # interrupted append; later records would share its line
+                            continue
+                        self._journal_bytes += len(line)
+            except Exception:
+                pass
+        self._migrate_memory()
+        if torn:
+            self._compact_memory()
+
+    def _migrate_memory(self) -> None:
+        """Bring memory written by older versions up to the current layout.
+
+        Anything that does not fit the layout is dropped rather than raised on, so a
+        damaged file costs its bad entries and never the agent.
+        """
+        recent_messages = self._memory.get("recent_messages")
+        if recent_messages is not None and not isinstance(recent_messages, list):
+            del self._memory["recent_messages"]
+            self._touch("recent_messages")
+        for key, columns in _RECORD_COLUMNS.items():
+            table = self._memory.get(key)
+            if table is None:
+                continue
+            # record lists used to hold one dict per record
+            if isinstance(table, list):
+                records = [record for record in table if isinstance(record, dict)]
+                table = {name: [record.get(name) for record in records] for name in columns}
+                self._touch(key)
+            if not (
+                isinstance(table, dict)
+                and all(isinstance(table.get(name), list) for name in columns)
+                and len({len(table[name]) for name in columns}) == 1
+            ):
+                del self._memory[key]
+                self._touch(key)
+                continue
+            if len(table) != len(columns):
+                table = {name: table[name] for name in columns}
+                self._touch(key)
+            self._memory[key] = table
+        # timestamps used to be ISO strings
+        for key, names in (
+            ("reminders", ("due_time", "created")),
+            ("notes", ("created",)),
+            ("tasks", ("created", "completed_at")),
+        ):
+            table = self._memory.get(key)
+            if not table:
+                continue
+            for name in names:
+                column = table[name]
+                for index, value in enumerate(column):
+                    if isinstance(value, str):
+                        try:
+                            column[index] = datetime.fromisoformat(value).timestamp()
+                        except ValueError:
+                            continue
+                        self._touch(key)
+            if key == "tasks":
+                continue
+            # the reminder and note listings do arithmetic on the leading timestamp
+            stamps = table[names[0]]
+            keep = [index for index, value in enumerate(stamps) if isinstance(value, (int, float))]
+            if len(keep) != len(stamps):
+                for name, column in table.items():
+                    table[name] = [column[index] for index in keep]
+                self._touch(key)
+        # reminders used to be kept in creation order
+        reminders = self._memory.get("reminders")
+        if reminders:
+            due_times = reminders["due_time"]
+            order = sorted(range(len(due_times)), key=due_times.__getitem__)
+            if order != list(range(len(due_times))):
+                for name, column in reminders.items():
+                    reminders[name] = [column[index] for index in order]
+                self._touch("reminders")
+
+    def _save_memory(self) -> None:
+        """Append the changed keys to the journal, compacting it once it grows long."""
+        if not self.memory_path:
+            self._dirty_keys.clear()
             return
         try:
-            with open(self.memory_path, "r", encoding="utf-8") as file:
-                self._memory = json.load(file)
+            with open(self._journal_path(), "ab") as file:
+                for key in self._dirty_keys:
+                    if key in self._memory:
+                        record = _dumps({"k": key, "v": self._memory[key]}) + b"\n"
+                        file.write(record)
+                        self._journal_bytes += len(record)
+            self._dirty_keys.clear()
         except Exception:
-            self._memory = {}
+            return
+        self._last_flush = time.monotonic()
+        self._unflushed = 0
+        if self._journal_bytes > max(_JOURNAL_COMPACT_RATIO * self._snapshot_bytes, _JOURNAL_MIN_BYTES):
+            self._compact_memory()
 
-    def _save_memory(self) -> None:
+    def _compact_memory(self) -> None:
+        """Atomically rewrite the full memory file and drop the journal it supersedes."""
         if not self.memory_path:
             return
+        tmp_path = f"{self.memory_path}.tmp"
         try:
-            with open(self.memory_path, "w", encoding="utf-8") as file:
-                json.dump(self._memory, file, indent=2, ensure_ascii=False)
+            data = _dumps(self._memory)
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+                # the rename must never expose a file whose data is still in flight
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.memory_path)
+            if os.path.exists(self._journal_path()):
+                os.remove(self._journal_path())
+            self._snapshot_bytes = len(data)
+            self._journal_bytes = 0
         except Exception:
             pass
 
 def _install_signal_handlers(on_interrupt: Callable[[], None]) -> None:
     def _handler(signum: int, _: Any) -> None:
         on_interrupt()
-        sys.exit(0)
+        # on_interrupt has written out everything worth keeping, so skip the
+        # interpreter teardown; only stdout still needs its buffer pushed out
+        sys.stdout.flush()
+        os._exit(0)
 
     try:
+        import signal
+
         signal.signal(signal.SIGINT, _handler)
         signal.signal(signal.SIGTERM, _handler)
     except Exception:
@@ -617,9 +1090,11 @@ def _print_cli_help() -> None:
     )
 
 def _run_repl() -> int:
-    agent = MessageAgent()
+    # the REPL is the only writer of its memory file and flushes on every way out
+    agent = MessageAgent(batch_writes=True)
 
     def _on_interrupt() -> None:
+        agent.flush()
         print("\nExiting... Bye!")
 
     _install_signal_handlers(_on_interrupt)
@@ -635,23 +1110,25 @@ def _run_repl() -> int:
         if not user_input:
             continue
 
-        if user_input.lower() in {"/quit", ":q", "exit"}:
+        command = user_input.lower()
+        if command in {"/quit", ":q", "exit"}:
             print("Bye!")
             break
 
-        if user_input.lower() in {"/help", "help", "?", "-h", "--help"}:
+        if command in {"/help", "help", "?", "-h", "--help"}:
             _print_cli_help()
             continue
 
-        if user_input.lower().startswith("/reset"):
+        if command.startswith("/reset"):
             agent.reset_memory()
             print("Memory cleared.")
             continue
 
-        if user_input.lower().startswith("/whoami"):
+        if command.startswith("/whoami"):
             parts = user_input.split(" ", 1)
             if len(parts) == 2 and parts[1].strip():
                 agent._memory["user_name"] = parts[1].strip()
+                agent._touch("user_name")
                 agent._save_memory()
                 print(f"Okay, I'll call you {parts[1].strip()}.")
             else:
@@ -661,6 +1138,7 @@ def _run_repl() -> int:
         response = agent.process(user_input)
         print(response.text)
 
+    agent.flush()
     return 0
 
 def _run_one_shot(message: str) -> int:
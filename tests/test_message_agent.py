@@ -0,0 +1,355 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+import unittest
+from unittest import mock
+
+import messsage_agent
+from messsage_agent import _CALC_NAMES, AgentResponse, MessageAgent, _compile_calc, _eval_calc
+
+
+class DispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.agent = MessageAgent(memory_path="")
+
+    def test_commands_win_over_keyword_scans(self):
+        self.assertEqual(self.agent.process("note say hi to bob").intent, "note_add")
+        self.assertEqual(self.agent.process("/echo hello").text, "hello")
+
+    def test_first_word_lookup_ignores_case(self):
+        self.assertEqual(self.agent.process("CALC 2+3").text, "Result: 5")
+
+    def test_reminder_variants_reach_the_reminder_handler(self):
+        for message in (
+            "remind me to call mom in 2 hours",
+            "remind, buy milk tomorrow",
+            "remind: call mom in 2 hours",
+            "reminding me to stretch in 5 minutes",
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(self.agent.process(message).intent, "reminder_set")
+
+    def test_keyword_handler_predicate_is_a_final_check(self):
+        self.agent.register_handler(
+            lambda message, _: message.lower().startswith("weather "),
+            lambda message, _: AgentResponse(text="sunny", intent="weather"),
+            keywords=("weather",),
+        )
+        self.assertEqual(self.agent.process("Weather today").intent, "weather")
+        self.assertEqual(self.agent.process("weather").intent, "fallback")
+
+    def test_prefix_handlers_match_the_start_of_the_message(self):
+        self.agent.register_handler(
+            lambda message, _: True,
+            lambda message, _: AgentResponse(text="sunny", intent="weather"),
+            prefixes=("weather",),
+        )
+        for message in ("weather today", "Weather: today", "weatherman"):
+            with self.subTest(message=message):
+                self.assertEqual(self.agent.process(message).intent, "weather")
+        self.assertEqual(self.agent.process("the weather").intent, "fallback")
+
+    def test_handlers_without_keywords_are_scanned(self):
+        self.agent.register_handler(
+            lambda message, _: "sunny" in message,
+            lambda message, _: AgentResponse(text="yes", intent="weather"),
+        )
+        self.assertEqual(self.agent.process("is it sunny today").intent, "weather")
+
+
+class ReminderTests(unittest.TestCase):
+    def test_reminders_are_listed_soonest_first(self):
+        agent = MessageAgent(memory_path="")
+        agent.process("remind me to b in 2 hours")
+        agent.process("remind me to a in 5 minutes")
+        listing = agent.process("reminders").text.splitlines()
+        self.assertIn("to a", listing[1])
+        self.assertIn("to b", listing[2])
+
+
+class CalcTests(unittest.TestCase):
+    def test_programs_match_python_arithmetic(self):
+        for expr in (
+            "2+5*10",
+            "-2 ** 2",
+            "floor(7 / 2) // 2 % 3",
+            "2 ** 100",
+            "(1+2j) * 2",
+            "sqrt(16) + pi",
+            "gcd(12, 18)",
+            "7 ^ 2",
+            "5 & 3 | 8",
+            "1 << 3 >> 1",
+            "~5",
+            "not 0",
+            "2 > 1",
+            "1 < 2 < 3",
+            "3 > 2 > 2",
+            "1 == 1.0 != 2",
+            "True + 1",
+        ):
+            with self.subTest(expr=expr):
+                expected = eval(expr, {"__builtins__": {}}, _CALC_NAMES)
+                result = _eval_calc(_compile_calc(expr))
+                self.assertEqual((result, type(result)), (expected, type(expected)))
+
+    def test_non_arithmetic_expressions_are_rejected(self):
+        for expr in ("(1).__class__", "pi.real", "'a' * 3", "[1, 2]", "1 if 1 else 2", "0 or 1", "x", "__import__('os')"):
+            with self.subTest(expr=expr):
+                with self.assertRaises((ValueError, NameError)):
+                    _compile_calc(expr)
+
+    def test_calc_errors_become_error_responses(self):
+        agent = MessageAgent(memory_path="")
+        self.assertEqual(agent.process("calc 1/0").intent, "error")
+        self.assertEqual(agent.process("calc (1).__class__").intent, "error")
+        self.assertEqual(agent.process("calc 7 ^ 2").text, "Result: 5")
+
+    def test_compiled_programs_are_shared_across_agents(self):
+        _compile_calc.cache_clear()
+        MessageAgent(memory_path="").process("calc 6*7")
+        self.assertEqual(MessageAgent(memory_path="").process("calc 6*7").text, "Result: 42")
+        info = _compile_calc.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_failed_compiles_are_not_cached(self):
+        _compile_calc.cache_clear()
+        agent = MessageAgent(memory_path="")
+        agent.process("calc nope")
+        agent.process("calc nope")
+        self.assertEqual(_compile_calc.cache_info().currsize, 0)
+
+
+class MetadataTests(unittest.TestCase):
+    def test_received_at_is_utc_iso_with_microseconds(self):
+        stamp = MessageAgent(memory_path="").process("hi").metadata["received_at"]
+        parsed = datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+        self.assertLess(abs(parsed - datetime.utcnow()), timedelta(seconds=5))
+
+    def test_handler_supplied_received_at_is_kept(self):
+        agent = MessageAgent(memory_path="")
+        agent.register_handler(
+            lambda message, _: message == "stamped",
+            lambda message, _: AgentResponse(text="ok", metadata={"received_at": "then"}),
+        )
+        self.assertEqual(agent.process("stamped").metadata["received_at"], "then")
+
+
+class ArgumentValidationTests(unittest.TestCase):
+    def setUp(self):
+        self.agent = MessageAgent(memory_path="")
+
+    def test_age_accepts_the_dates_strptime_accepted(self):
+        for message in ("age 2000-05-17", "age 2000-5-7"):
+            with self.subTest(message=message):
+                self.assertEqual(self.agent.process(message).intent, "age")
+
+    def test_age_rejects_malformed_and_impossible_dates(self):
+        for message in ("age bad", "age 2001-02-29", "age 12345-01-01", "age 2000-05-17x"):
+            with self.subTest(message=message):
+                response = self.agent.process(message)
+                self.assertEqual(response.intent, "error")
+                self.assertTrue(response.text.startswith("Usage: age"))
+
+    def test_leap(self):
+        self.assertEqual(self.agent.process("leap 2024").text, "2024 is a leap year.")
+        self.assertEqual(self.agent.process("leap 1900").text, "1900 is not a leap year.")
+        self.assertEqual(self.agent.process("leap -4").text, "-4 is a leap year.")
+
+    def test_leap_rejects_non_years_without_raising(self):
+        for message in ("leap x", "leap 1_000", "leap 1234567890", "leap " + "9" * 5000):
+            with self.subTest(message=message[:20]):
+                self.assertEqual(self.agent.process(message).intent, "error")
+
+
+def _offline(*_args, **_kwargs):
+    raise OSError("network disabled in tests")
+
+
+class SearchTests(unittest.TestCase):
+    def setUp(self):
+        self.agent = MessageAgent(memory_path="")
+
+    def test_search_offline_returns_error_response(self):
+        with mock.patch("urllib.request.urlopen", _offline):
+            response = self.agent.process("search x")
+        self.assertEqual(response.intent, "error")
+        self.assertIn("https://duckduckgo.com/?q=x", response.text)
+
+    def test_search_with_surrogate_returns_error_response(self):
+        # what undecodable bytes in argv turn into on Linux
+        with mock.patch("urllib.request.urlopen", _offline):
+            response = self.agent.process("search \udcff")
+        self.assertEqual(response.intent, "error")
+        self.assertIn("https://duckduckgo.com/?q=%3F", response.text)
+
+
+class MalformedMemoryTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.memory_path = os.path.join(self._tmp.name, "memory.json")
+
+    def _load(self, payload):
+        with open(self.memory_path, "w", encoding="utf-8") as file:
+            file.write(payload)
+        return MessageAgent(memory_path=self.memory_path)
+
+    def test_malformed_files_load_without_raising(self):
+        for payload in (
+            '{"notes": "x"}',
+            '{"reminders": [1, 2]}',
+            '{"notes": {"text": ["a"]}}',
+            "[1, 2]",
+            '{"recent_messages": 3}',
+            '{"reminders": {"text": ["a"], "due_time": [], "created": []}}',
+        ):
+            with self.subTest(payload=payload):
+                agent = self._load(payload)
+                self.assertEqual(agent.process("notes").text, "No notes saved.")
+                self.assertEqual(agent.process("reminders").text, "No reminders set.")
+                self.assertEqual(agent.process("hmm").intent, "fallback")
+
+    def test_rows_without_a_usable_timestamp_are_dropped(self):
+        agent = self._load(
+            '{"reminders": [{"text": "a", "due_time": "nope", "created": 1}, {"text": "b", "due_time": 5, "created": 2}]}'
+        )
+        self.assertEqual(agent.process("reminders").text, "Your reminders:\n1. b - ⏰ DUE")
+        agent = self._load('{"reminders": {"text": ["a", "b"], "due_time": ["nope", 5], "created": [1, 2]}}')
+        self.assertEqual(agent.process("reminders").text, "Your reminders:\n1. b - ⏰ DUE")
+
+    def test_iso_timestamps_are_converted_on_load(self):
+        agent = self._load('{"notes": [{"text": "milk", "created": "2001-01-01T08:00:00"}]}')
+        self.assertEqual(agent.process("notes").text, "Your notes:\n1. milk (Jan 01, 08:00 AM)")
+
+
+class PersistenceTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.memory_path = os.path.join(self._tmp.name, "memory.json")
+
+    def _write(self, path, payload):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(payload)
+
+    def test_loads_baseline_record_lists(self):
+        self._write(self.memory_path, json.dumps({
+            "reminders": [
+                {"text": "later", "due_time": "2001-01-02T09:00:00", "created": "2001-01-01T08:00:00"},
+                {"text": "sooner", "due_time": "2001-01-01T10:00:00", "created": "2001-01-01T08:30:00"},
+            ],
+            "notes": [{"text": "milk", "created": "2001-01-01T08:00:00"}],
+            "tasks": [{"text": "ship", "created": "2001-01-01T08:00:00", "completed": False, "completed_at": None}],
+        }))
+        agent = MessageAgent(memory_path=self.memory_path)
+        self.assertEqual(
+            agent.process("reminders").text,
+            "Your reminders:\n1. sooner - ⏰ DUE\n2. later - ⏰ DUE",
+        )
+        self.assertEqual(agent.process("notes").text, "Your notes:\n1. milk (Jan 01, 08:00 AM)")
+        self.assertEqual(agent.process("tasks").text, "Pending:\n1. ○ ship")
+        self.assertIsInstance(agent._memory["tasks"]["created"][0], float)
+
+    def test_journal_is_replayed_over_the_snapshot(self):
+        self._write(self.memory_path, json.dumps({
+            "user_name": "Ada",
+            "notes": {"text": ["old"], "created": [978336000.0]},
+        }))
+        self._write(
+            self.memory_path + ".log",
+            json.dumps({"k": "notes", "v": {"text": ["old", "new"], "created": [978336000.0, 978336060.0]}}) + "\n",
+        )
+        agent = MessageAgent(memory_path=self.memory_path)
+        self.assertEqual(agent.process("notes").text.count("\n"), 2)
+        self.assertIn("Ada", agent.process("hello").text)
+
+    def test_torn_journal_line_is_skipped(self):
+        self._write(self.memory_path, "{}")
+        self._write(
+            self.memory_path + ".log",
+            json.dumps({"k": "user_name", "v": "Ada"}) + "\n" + '{"k": "notes", "v": {"te',
+        )
+        agent = MessageAgent(memory_path=self.memory_path)
+        self.assertEqual(agent.process("notes").text, "No notes saved.")
+        self.assertIn("Ada", agent.process("hello").text)
+        # the torn tail is folded away so later appends start on a fresh line
+        self.assertFalse(os.path.exists(self.memory_path + ".log"))
+
+    def test_changes_survive_a_reload_until_reset(self):
+        agent = MessageAgent(memory_path=self.memory_path)
+        agent.process("note buy milk")
+        reloaded = MessageAgent(memory_path=self.memory_path)
+        self.assertEqual(reloaded.process("notes").text.count("\n"), 1)
+        reloaded.reset_memory()
+        self.assertEqual(MessageAgent(memory_path=self.memory_path).process("notes").text, "No notes saved.")
+
+    def test_task_timestamps_are_epoch_seconds(self):
+        agent = MessageAgent(memory_path=self.memory_path)
+        agent.process("task ship it")
+        agent.process("done 1")
+        tasks = agent._memory["tasks"]
+        self.assertIsInstance(tasks["created"][0], float)
+        self.assertIsInstance(tasks["completed_at"][0], float)
+
+    def test_done_on_an_empty_agent_adds_no_tasks_table(self):
+        agent = MessageAgent(memory_path=self.memory_path)
+        self.assertEqual(agent.process("done 1").text, "Task 1 not found.")
+        self.assertNotIn("tasks", agent._memory)
+
+
+class EmptyMessageTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.memory_path = os.path.join(self._tmp.name, "memory.json")
+
+    def test_empty_and_whitespace_messages_are_noops(self):
+        agent = MessageAgent(memory_path=self.memory_path)
+        for message in ("", "   ", "\t\n"):
+            with self.subTest(message=message):
+                self.assertEqual(agent.process(message).intent, "noop")
+        self.assertNotIn("recent_messages", agent._memory)
+
+    def test_message_emptied_by_a_preprocessor_is_a_noop(self):
+        agent = MessageAgent(memory_path=self.memory_path, preprocessors=[lambda message: ""])
+        self.assertEqual(agent.process("hi").intent, "noop")
+        self.assertNotIn("recent_messages", agent._memory)
+
+
+class WriteBatchingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.memory_path = os.path.join(self._tmp.name, "memory.json")
+
+    def _note_count(self):
+        return MessageAgent(memory_path=self.memory_path).process("notes").text.count("\n")
+
+    def test_changes_reach_a_new_agent_without_flush(self):
+        agent = MessageAgent(memory_path=self.memory_path)
+        agent.process("note one")
+        agent.process("note two")
+        del agent
+        self.assertEqual(self._note_count(), 2)
+
+    def test_batched_changes_wait_for_flush(self):
+        with mock.patch.object(messsage_agent, "_FLUSH_INTERVAL", 3600):
+            agent = MessageAgent(memory_path=self.memory_path, batch_writes=True)
+            agent.process("note one")  # the first change is written at once
+            agent.process("note two")
+            self.assertEqual(self._note_count(), 1)
+            agent.flush()
+            self.assertEqual(self._note_count(), 2)
+
+    def test_batched_changes_are_written_every_few_messages(self):
+        with mock.patch.object(messsage_agent, "_FLUSH_INTERVAL", 3600):
+            agent = MessageAgent(memory_path=self.memory_path, batch_writes=True)
+            for index in range(1 + messsage_agent._FLUSH_EVERY):
+                agent.process(f"note {index}")
+            self.assertEqual(self._note_count(), 1 + messsage_agent._FLUSH_EVERY)
+
+
+if __name__ == "__main__":
+    unittest.main()